@@ -1,10 +1,14 @@
 #!/usr/bin/env python
-import boto3
-import plotly.graph_objects as go
-from collections import OrderedDict
+from collections import deque
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import fire
+from functools import lru_cache
 import logging
-from typing import List, Dict, Tuple, Set
+from itertools import chain
+from operator import itemgetter
+from sys import intern
+from typing import Iterator, List, Dict, Tuple
 from datetime import datetime
 
 # Constants
@@ -12,6 +16,12 @@ SECONDS_IN_HOUR = 3600
 SECONDS_IN_MINUTE = 60
 DEFAULT_PROFILE = "default"
 DEFAULT_REGION = "us-east-2"
+DEFAULT_MAX_WORKERS = 16
+MAX_POOL_CONNECTIONS = 32
+DEFAULT_MAX_BARS = 1500
+BAR_RENDER_THRESHOLD = 500  # Above this many resources, draw bar traces instead of one waterfall each
+STACK_RESOURCE_TYPE = intern("AWS::CloudFormation::Stack")
+CREATE_STATUSES = frozenset({"CREATE_IN_PROGRESS", "CREATE_COMPLETE"})  # The only statuses that shape the waterfall
 DEFAULT_FONT = {"family": "Open Sans, light", "color": "black", "size": 14}
 COLORS = {
     "stack": {
@@ -27,6 +37,15 @@ COLORS = {
     },
     "waiting": "#ECF0F1"          # Light gray for waiting periods
 }
+# Trace properties shared by every resource; construct_event_trace fills in the rest
+TRACE_TEMPLATE = {
+    "orientation": "h",
+    "textfont": DEFAULT_FONT,
+    "textposition": "outside",
+    "width": 0.6,  # Reduced from 0.8 to create more spacing
+    "decreasing": {"marker": {"color": COLORS["waiting"]}},
+    "connector": {"visible": False}
+}
 
 # Initialize a module-level logger
 logger = logging.getLogger("cfplot_logger")
@@ -40,10 +59,12 @@ def setup_logging(debug: bool) -> None:
     
     logger.addHandler(handler)
 
+@lru_cache(maxsize=4096)
 def format_time_from_seconds(seconds: int) -> str:
-    hours, remainder = divmod(seconds, SECONDS_IN_HOUR)
-    minutes, seconds = divmod(remainder, SECONDS_IN_MINUTE)
-    return f"{hours:02}:{minutes:02}:{seconds:02}"
+    # Many resources share exact durations, so the cache absorbs most calls
+    hours = seconds // SECONDS_IN_HOUR
+    minutes = (seconds // SECONDS_IN_MINUTE) % SECONDS_IN_MINUTE
+    return f"{hours:02}:{minutes:02}:{seconds % SECONDS_IN_MINUTE:02}"
 
 def get_resource_category(resource_type: str) -> str:
     """
@@ -65,53 +86,110 @@ def get_resource_category(resource_type: str) -> str:
         return "security"
     return "other"
 
-def get_stack_creation_events(stackname: str, cf_client) -> Tuple[List[Dict], Dict[str, str], datetime]:
+@lru_cache(maxsize=None)
+def get_cf_client(profile: str, region: str, max_pool_connections: int = MAX_POOL_CONNECTIONS):
+    """
+    Return a CloudFormation client for the profile and region, building the session only once
+    """
+    # boto3 is slow to import, so only load it once a client is needed
+    import boto3
+    from botocore.config import Config
+
+    # botocore clients are thread-safe, so one client is shared by every worker. Adaptive
+    # retries add client-side rate limiting so parallel fetches back off instead of throttling
+    config = Config(
+        retries={"mode": "adaptive", "max_attempts": 10},
+        max_pool_connections=max_pool_connections
+    )
+    session = boto3.session.Session(profile_name=profile, region_name=region)
+    return session.client("cloudformation", config=config)
+
+def clear_cf_clients() -> None:
     """
-    Get initial creation events for a single stack and identify nested stacks
+    Drop cached CloudFormation clients, e.g. after credentials change
     """
-    paginator = cf_client.get_paginator("describe_stack_events")
-    all_events = []
+    get_cf_client.cache_clear()
+
+def get_stack_creation_events(stackname: str, paginator) -> Tuple[List[Dict], List[Tuple[str, datetime]], datetime]:
+    """
+    Get initial creation events for a single stack and identify nested stacks,
+    which are returned as (physical ID, creation time) pairs in creation order
+    """
+    runs = []
     for page in paginator.paginate(StackName=stackname):
-        all_events.extend(page["StackEvents"])
+        # Pages come back newest-first, so each reversed page is an ascending run.
+        # Only create events feed the waterfall; drop updates, deletes, rollbacks and failures up front
+        run = []
+        for event in reversed(page["StackEvents"]):
+            if event["ResourceStatus"] in CREATE_STATUSES:
+                # The same few strings repeat across every event; interning them lets the
+                # comparisons and dict lookups downstream succeed on identity
+                event["ResourceStatus"] = intern(event["ResourceStatus"])
+                event["ResourceType"] = intern(event["ResourceType"])
+                event["StackName"] = intern(event["StackName"])
+                event["LogicalResourceId"] = intern(event["LogicalResourceId"])
+                run.append(event)
+        runs.append(run)
     
-    # Sort chronologically
-    all_events.sort(key=lambda x: x["Timestamp"])
+    # Merge the pre-sorted runs chronologically, oldest page first
+    all_events = list(heapq.merge(*reversed(runs), key=itemgetter("Timestamp")))
     
     # Debug log the first few events
-    logger.debug(f"First 3 events for stack {stackname}:")
-    for event in all_events[:3]:
-        logger.debug(f"Event: Status={event['ResourceStatus']}, "
-                     f"Type={event['ResourceType']}, "
-                     f"LogicalId={event['LogicalResourceId']}, "
-                     f"Reason={event.get('ResourceStatusReason', 'No reason')}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("First 3 events for stack %s:", stackname)
+        for event in all_events[:3]:
+            logger.debug("Event: Status=%s, Type=%s, LogicalId=%s, Reason=%s",
+                         event["ResourceStatus"], event["ResourceType"],
+                         event["LogicalResourceId"], event.get("ResourceStatusReason", "No reason"))
     
-    # For nested stacks, find the first CREATE_IN_PROGRESS and CREATE_COMPLETE events
-    start_event = next(
-        (e for e in all_events 
-         if e["ResourceStatus"] == "CREATE_IN_PROGRESS" 
-         and e["ResourceType"] == "AWS::CloudFormation::Stack"
-         and e.get("ResourceStatusReason", "") == "User Initiated"),
-        None
-    )
-    
-    # Get the actual logical ID from the stack events
-    stack_logical_id = next(
-        (e["LogicalResourceId"] for e in all_events 
-         if e["ResourceType"] == "AWS::CloudFormation::Stack"),
-        stackname.split('/')[-1]
-    )
+    # Single pass over the sorted events: find the stack's start and completion, and collect
+    # the events in between along with any nested stacks they create
+    start_time = None
+    complete_time = None
+    stack_logical_id = None
+    nested_stacks = []
+    seen_nested_stacks = set()
+    creation_events = []
     
-    complete_event = next(
-        (e for e in all_events 
-         if e["ResourceStatus"] == "CREATE_COMPLETE"
-         and e["ResourceType"] == "AWS::CloudFormation::Stack"
-         and e["LogicalResourceId"] == stack_logical_id),
-        None
-    )
+    for event in all_events:
+        timestamp = event["Timestamp"]
+        # Events sharing the completion timestamp still fall inside the window
+        if complete_time is not None and timestamp > complete_time:
+            break
+        
+        resource_status = event["ResourceStatus"]
+        is_stack = event["ResourceType"] == STACK_RESOURCE_TYPE
+        if is_stack:
+            # The first stack event carries the stack's own logical ID
+            if stack_logical_id is None:
+                stack_logical_id = event["LogicalResourceId"]
+            if (start_time is None and resource_status == "CREATE_IN_PROGRESS"
+                    and event.get("ResourceStatusReason", "") == "User Initiated"):
+                start_time = timestamp
+            elif (start_time is not None and complete_time is None and resource_status == "CREATE_COMPLETE"
+                    and event["LogicalResourceId"] == stack_logical_id):
+                complete_time = timestamp
+        
+        # Only include events from stack start onwards
+        if start_time is None:
+            continue
+        creation_events.append(event)
+        
+        # Track nested stack creation; most events fail the resource type check
+        if is_stack and resource_status == "CREATE_IN_PROGRESS":
+            physical_id = event["PhysicalResourceId"]
+            # A stack's own events carry its ARN, which must not be queued as a nested stack
+            if (physical_id and physical_id != stackname and physical_id != event["StackId"]
+                    and physical_id not in seen_nested_stacks):
+                # Events are chronological, so appending keeps creation order
+                seen_nested_stacks.add(physical_id)
+                nested_stacks.append((physical_id, timestamp))
+                logger.debug("Detected nested stack: %s with LogicalId: %s at %s",
+                             physical_id, event["LogicalResourceId"], timestamp)
     
-    if not start_event or not complete_event:
+    if start_time is None or complete_time is None:
         logger.warning(f"Could not find start or complete event for stack: {stackname}")
-        logger.warning(f"Looking for logical ID: {stack_logical_id}")
+        logger.warning(f"Looking for logical ID: {stack_logical_id or stackname.split('/')[-1]}")
         logger.warning(f"Total events found: {len(all_events)}")
         if all_events:
             logger.warning("First event:")
@@ -122,262 +200,386 @@ def get_stack_creation_events(stackname: str, cf_client) -> Tuple[List[Dict], Di
             logger.warning(f"Status={all_events[-1]['ResourceStatus']}, "
                            f"Type={all_events[-1]['ResourceType']}, "
                            f"LogicalId={all_events[-1]['LogicalResourceId']}")
-        return [], {}, None
-    
-    start_time = start_event["Timestamp"]
-    complete_time = complete_event["Timestamp"]
+        return [], [], None
     
     logger.info(f"Found valid start/complete events for {stackname}")
-    logger.debug(f"Start: {start_time}, Complete: {complete_time}")
-    
-    # Track nested stacks and their creation times
-    nested_stacks = {}
-    creation_events = []
-    
-    for event in all_events:
-        # Only include events between stack start and complete
-        if start_time <= event["Timestamp"] <= complete_time:
-            creation_events.append(event)
-            
-            # Track nested stack creation
-            if (event["ResourceType"] == "AWS::CloudFormation::Stack" and 
-                event["PhysicalResourceId"] != stackname and
-                event["ResourceStatus"] == "CREATE_IN_PROGRESS" and
-                event["PhysicalResourceId"]):
-                nested_stacks[event["PhysicalResourceId"]] = event["Timestamp"]
-                logger.debug(f"Detected nested stack: {event['PhysicalResourceId']} "
-                             f"with LogicalId: {event['LogicalResourceId']} "
-                             f"at {event['Timestamp']}")
+    logger.debug("Start: %s, Complete: %s", start_time, complete_time)
     
     return creation_events, nested_stacks, complete_time
 
-def retrieve_cf_events(stackname: str, profile: str, region: str, root_complete_time: datetime = None, processed_stacks: Set[str] = None) -> List[Dict]:
+def retrieve_cf_events(stackname: str, paginator, max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Dict]:
     """
-    Retrieve all events including nested stacks for initial creation only
+    Retrieve all events including nested stacks for initial creation only,
+    yielded in chronological order across every stack
     """
     if not stackname:
         logger.error("Stack name is required to retrieve events.")
-        return []
-        
-    if processed_stacks is None:
-        processed_stacks = set()
-        
-    if stackname in processed_stacks:
-        logger.info(f"Stack {stackname} has already been processed.")
-        return []
-        
-    processed_stacks.add(stackname)
-    
+        return
+
+    # The root stack bounds which nested stacks are followed, so fetch it first
     logger.info(f"Retrieving events for stack: {stackname}")
-    session = boto3.session.Session(profile_name=profile, region_name=region)
-    cf_client = session.client("cloudformation")
-    
-    # Get events for this stack and identify nested stacks
-    stack_events, nested_stacks, stack_complete_time = get_stack_creation_events(stackname, cf_client)
-    
-    # For root stack, establish the completion time
-    complete_time = root_complete_time or stack_complete_time
+    stack_events, nested_stacks, complete_time = get_stack_creation_events(stackname, paginator)
     if not complete_time:
         logger.warning(f"No completion time found for stack: {stackname}")
-        return []
-    
-    all_events = stack_events.copy()
-    
-    # Process nested stacks in creation order, but only if created before root stack completed
-    for nested_stack, creation_time in sorted(nested_stacks.items(), key=lambda x: x[1]):
-        if nested_stack and creation_time <= complete_time:  # Only process stacks created before root completion
-            logger.debug(f"Processing nested stack: {nested_stack} (created at {creation_time})")
-            try:
-                nested_events = retrieve_cf_events(
-                    stackname=nested_stack,
-                    profile=profile,
-                    region=region,
-                    root_complete_time=complete_time,  # Pass down the root completion time
-                    processed_stacks=processed_stacks
-                )
-                logger.debug(f"Retrieved {len(nested_events)} events from nested stack: {nested_stack}")
-                all_events.extend(nested_events)
-            except Exception as e:
-                logger.warning(f"Could not retrieve events for nested stack {nested_stack}: {str(e)}")
-    
-    logger.info(f"Total events for stack {stackname}: {len(all_events)}")
-    return all_events
+        return
+
+    # Each stack's events are already sorted, so keep them as separate runs to merge
+    stack_runs = [stack_events]
+    processed_stacks = {stackname}
+    queue = deque(
+        nested_stack for nested_stack, creation_time in nested_stacks
+        if creation_time <= complete_time
+    )
+
+    # Fetch nested stacks concurrently, feeding newly discovered children back into the pool
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        while queue or pending:
+            while queue:
+                nested_stack = queue.popleft()
+                if nested_stack in processed_stacks:
+                    logger.info(f"Stack {nested_stack} has already been processed.")
+                    continue
+                processed_stacks.add(nested_stack)
+                logger.info(f"Retrieving events for stack: {nested_stack}")
+                pending[executor.submit(get_stack_creation_events, nested_stack, paginator)] = nested_stack
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                nested_stack = pending.pop(future)
+                try:
+                    stack_events, nested_stacks, _ = future.result()
+                except Exception as e:
+                    logger.warning(f"Could not retrieve events for nested stack {nested_stack}: {str(e)}")
+                    continue
+
+                logger.debug("Retrieved %d events from nested stack: %s", len(stack_events), nested_stack)
+                stack_runs.append(stack_events)
+
+                # Only follow stacks created before the root stack completed
+                for child_stack, creation_time in nested_stacks:
+                    if creation_time <= complete_time:
+                        logger.debug("Queueing nested stack: %s (created at %s)", child_stack, creation_time)
+                        queue.append(child_stack)
 
-def construct_event_trace(start_time, data, event, is_total=False):
+    logger.info(f"Total events for stack {stackname}: {sum(len(run) for run in stack_runs)}")
+    yield from heapq.merge(*stack_runs, key=itemgetter("Timestamp"))
+
+def construct_event_trace(data, event, is_total=False):
     """
     Construct waterfall trace for a single resource
     """
-    is_stack = event["ResourceType"] == "AWS::CloudFormation::Stack"
-    is_main_stack = is_stack and event["StackName"] == event["LogicalResourceId"]
-    resource_category = get_resource_category(event["ResourceType"])
-    
     trace = {
-        "x": [],
-        "y": [[], []],
-        "text": [],
-        "textfont": DEFAULT_FONT,
-        "textposition": "outside",
-        "width": 0.6,  # Reduced from 0.8 to create more spacing
-        "base": (data["identified"] - start_time).seconds,
-        "measure": [],
-        "increasing": {
-            "marker": {
-                "color": COLORS["stack"]["main"] if is_main_stack else
-                        COLORS["stack"]["nested"] if is_stack else
-                        COLORS["resource"][resource_category]
-            }
-        },
-        "decreasing": {"marker": {"color": COLORS["waiting"]}}
+        **TRACE_TEMPLATE,
+        "base": data["identified"],
+        "increasing": {"marker": {"color": get_trace_color(event)}}
     }
     update_trace(event, trace, is_total, data)
     return trace
 
+def construct_bar_traces(completed):
+    """
+    Construct a waiting and a creating bar trace covering every completed resource
+    """
+    stack_names = []
+    logical_ids = []
+    waiting_base = []
+    waiting_x = []
+    creating_base = []
+    creating_x = []
+    colors = []
+    text = []
+    for event, data in completed:
+        offset = data["identified"]
+        stack_names.append(event["StackName"])
+        logical_ids.append(event["LogicalResourceId"])
+        waiting_base.append(offset)
+        waiting_x.append(data["duration_i2s"])
+        creating_base.append(offset + data["duration_i2s"])
+        creating_x.append(data["duration_s2e"])
+        colors.append(get_trace_color(event))
+        text.append(format_time_from_seconds(data["duration"]))
+    
+    y = [stack_names, logical_ids]
+    return [
+        {
+            "orientation": "h",
+            "y": y,
+            "base": waiting_base,
+            "x": waiting_x,
+            "marker": {"color": COLORS["waiting"]}
+        },
+        {
+            "orientation": "h",
+            "y": y,
+            "base": creating_base,
+            "x": creating_x,
+            "text": text,
+            "textfont": DEFAULT_FONT,
+            "textposition": "outside",
+            "marker": {"color": colors}
+        }
+    ]
+
+def get_trace_color(event) -> str:
+    """
+    Pick the bar colour for a resource from its type
+    """
+    is_stack = event["ResourceType"] == STACK_RESOURCE_TYPE
+    if is_stack and event["StackName"] == event["LogicalResourceId"]:
+        return COLORS["stack"]["main"]
+    if is_stack:
+        return COLORS["stack"]["nested"]
+    return COLORS["resource"][get_resource_category(event["ResourceType"])]
+
+def get_color_label(color: str) -> str:
+    """
+    Map a bar colour back to the resource type shown on hover
+    """
+    if color == COLORS["stack"]["main"]:
+        return "Main Stack"
+    elif color == COLORS["stack"]["nested"]:
+        return "Nested Stack"
+    elif color == COLORS["waiting"]:
+        return "Waiting"
+    # Reverse lookup the resource category
+    return next(
+        (k.title() for k, v in COLORS["resource"].items() if v == color),
+        "Resource"
+    )
+
 def update_trace(event, trace, is_total, data):
     """
     Update trace with timing information
     """
-    trace["y"][0].append(event["StackName"])
-    trace["y"][1].append(event["LogicalResourceId"])
+    # Each resource contributes a fixed number of segments, so build the lists outright
+    stack_name = event["StackName"]
+    logical_id = event["LogicalResourceId"]
+    total_text = format_time_from_seconds(data["duration"])
     
     if is_total:
-        trace["x"].append(0)
-        trace["measure"].append("relative")
-        trace["text"].append("")
-        trace["text"].append(format_time_from_seconds(data["duration"].seconds))
+        trace["x"] = [0]
+        trace["y"] = [[stack_name], [logical_id]]
+        trace["measure"] = ["relative"]
+        trace["text"] = ["", total_text]
     else:
-        # Add waiting time segment (identification to start)
-        if data["duration_i2s"].seconds > 0:
-            trace["x"].append(data["duration_i2s"].seconds)
-            trace["measure"].append("relative")
-            trace["text"].append("")
-            trace["y"][0].append(event["StackName"])
-            trace["y"][1].append(event["LogicalResourceId"])
-        
-        # Add creation time segment (start to end)
-        trace["x"].append(data["duration_s2e"].seconds)
-        trace["measure"].append("relative")
-        trace["text"].append(format_time_from_seconds(data["duration"].seconds))
+        # Always two segments, so every trace has the same shape: waiting time
+        # (identification to start, possibly zero) then creation time (start to end)
+        trace["x"] = [data["duration_i2s"], data["duration_s2e"]]
+        trace["y"] = [[stack_name, stack_name], [logical_id, logical_id]]
+        trace["measure"] = ["relative", "relative"]
+        trace["text"] = ["", total_text]
+
+def main(stackname: str, profile: str = DEFAULT_PROFILE, region: str = DEFAULT_REGION, debug: bool = False,
+         max_bars: int = DEFAULT_MAX_BARS, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    # plotly is slow to import, so only load it once there is work to do
+    import plotly.graph_objects as go
 
-def main(stackname: str, profile: str = DEFAULT_PROFILE, region: str = DEFAULT_REGION, debug: bool = False) -> None:
     setup_logging(debug)
     logger.info(f"Starting retrieval of events for stack: {stackname}")
-    data = OrderedDict()
-    fig = go.Figure()
+    data = {}
     try:
-        events = retrieve_cf_events(stackname=stackname, profile=profile, region=region)
-        if not events:
+        # Size the connection pool so workers don't wait on connections
+        cf_client = get_cf_client(profile, region, max(MAX_POOL_CONNECTIONS, max_workers))
+        # One paginator serves every stack; paginate() hands each call its own iterator
+        paginator = cf_client.get_paginator("describe_stack_events")
+        events = retrieve_cf_events(stackname=stackname, paginator=paginator, max_workers=max_workers)
+        first_event = next(events, None)
+        if first_event is None:
             logger.error("No events found for the stack.")
             return
-        start_time = events[0]["Timestamp"]
-        process_events(events, start_time, data, fig)
-        display_figure(fig, data, events, stackname)
+        start_time = int(first_event["Timestamp"].timestamp())
+        traces, event_count = process_events(chain([first_event], events), start_time, data, max_bars=max_bars)
+        fig = go.Figure(data=traces)
+        display_figure(fig, data, event_count, stackname)
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
 
-def process_events(events, start_time, data, fig):
+def process_events(events, start_time, data, max_bars=DEFAULT_MAX_BARS):
     """
-    Process events and create waterfall traces
+    Process a stream of events into waterfall traces, returning the traces and the number of events seen
     """
-    # First pass: collect all timing data
+    import plotly.graph_objects as go
+
+    # Single pass over the events: collect all timing data and index the first
+    # completion of each resource, which yields one trace candidate per resource
+    event_count = 0
+    completions = {}
     for event in events:
-        update_data_for_event(event, data)
+        event_count += 1
+        resource_data = update_data_for_event(event, data, start_time)
+        if resource_data is not None:
+            completions.setdefault((event["StackName"], event["LogicalResourceId"]), (event, resource_data))
     
-    # Track which stacks we've already processed
-    processed_stacks = set()
-    traces_created = 0
-    
-    # Second pass: create traces for completed resources
-    for event in events:
-        stack_name = event["StackName"]
-        logical_id = event["LogicalResourceId"]
+    completed = []
+    for (stack_name, logical_id), (event, resource_data) in completions.items():
+        if resource_data["duration"] is None:
+            continue
         
-        # Create a unique identifier for this stack
-        stack_identifier = f"{stack_name}/{logical_id}"
+        # Skip root stack self-reference
+        if (event["ResourceType"] == STACK_RESOURCE_TYPE and 
+            stack_name == logical_id):
+            logger.debug("Skipping root stack self-reference: %s", stack_name)
+            continue
         
-        if (event["ResourceStatus"] == "CREATE_COMPLETE" and 
-            stack_name in data and 
-            logical_id in data[stack_name] and 
-            data[stack_name][logical_id]["duration"] is not None):
-            
-            # Skip if we've already processed this stack
-            if stack_identifier in processed_stacks:
-                logger.debug(f"Skipping already processed stack: {stack_identifier}")
-                continue
-            
-            # Skip root stack self-reference
-            if (event["ResourceType"] == "AWS::CloudFormation::Stack" and 
-                stack_name == logical_id):
-                logger.debug(f"Skipping root stack self-reference: {stack_name}")
-                continue
-            
-            trace = construct_event_trace(
-                start_time=start_time,
-                data=data[stack_name][logical_id],
-                event=event
-            )
-            fig.add_trace(go.Waterfall(orientation="h", **trace))
-            traces_created += 1
-            
-            # Mark this stack as processed
-            processed_stacks.add(stack_identifier)
-            
-            if event["ResourceType"] == "AWS::CloudFormation::Stack":
-                logger.debug(f"Created trace for stack: {logical_id}")
+        completed.append((event, resource_data))
+        
+        if event["ResourceType"] == STACK_RESOURCE_TYPE:
+            logger.debug("Collected completed stack: %s", logical_id)
+    
+    if len(completed) > max_bars:
+        completed = coalesce_short_resources(completed, max_bars)
+    
+    if len(completed) > BAR_RENDER_THRESHOLD:
+        # A waterfall per resource costs a trace each in the browser; two bar traces cover them all
+        logger.info(f"Rendering {len(completed)} resources as bar traces")
+        traces = [go.Bar(**trace) for trace in construct_bar_traces(completed)]
+    else:
+        traces = [
+            go.Waterfall(**construct_event_trace(data=resource_data, event=event))
+            for event, resource_data in completed
+        ]
     
-    logger.info(f"Created {traces_created} traces for visualization")
+    logger.info(f"Created {len(traces)} traces for visualization")
+    return traces, event_count
 
-def update_data_for_event(event, data):
+def coalesce_short_resources(completed, max_bars):
     """
-    Update the data structure with event information for waterfall visualization
+    Keep the longest-running resources and fold the rest into one summary bar per stack
     """
-    stack_name = event["StackName"]
-    logical_resource_id = event["LogicalResourceId"]
-    resource_status = event["ResourceStatus"]
-    resource_status_reason = event.get("ResourceStatusReason", "").lower()
-    timestamp = event["Timestamp"]
-
-    # Initialize stack data if needed
-    if stack_name not in data:
-        data[stack_name] = {}
-
-    # Initialize resource data if needed
-    if logical_resource_id not in data[stack_name]:
-        data[stack_name][logical_resource_id] = {
-            "identified": None,  # When resource is first seen
-            "start": None,      # When creation actually starts
-            "end": None,        # When creation completes
-            "duration": None,   # Total time from identification to completion
-            "duration_i2s": None,  # Time from identification to start
-            "duration_s2e": None   # Time from start to completion
+    stack_names = {event["StackName"] for event, _ in completed}
+    keep_count = max(max_bars - len(stack_names), 0)
+    by_duration = sorted(completed, key=lambda item: item[1]["duration"], reverse=True)
+    
+    kept_ids = {id(item) for item in by_duration[:keep_count]}
+    grouped = {}
+    for item in by_duration[keep_count:]:
+        grouped.setdefault(item[0]["StackName"], []).append(item)
+    
+    # A lone leftover resource takes the same single bar as a summary would
+    for items in grouped.values():
+        if len(items) == 1:
+            kept_ids.add(id(items[0]))
+    grouped = {stack_name: items for stack_name, items in grouped.items() if len(items) > 1}
+    
+    logger.info(f"Coalescing {len(completed) - len(kept_ids)} short resources into {len(grouped)} summary bars")
+    
+    # Preserve the original (chronological) order of the resources we keep
+    reduced = [item for item in completed if id(item) in kept_ids]
+    for stack_name, items in grouped.items():
+        resources = [resource_data for _, resource_data in items]
+        # The summary bar spans the window in which the coalesced resources were created
+        identified = min(r["identified"] for r in resources)
+        start = min(r["start"] for r in resources)
+        end = max(r["end"] for r in resources)
+        event = {
+            "StackName": stack_name,
+            "LogicalResourceId": f"{len(resources)} other resources",
+            "ResourceType": "Other"
         }
+        reduced.append((event, {
+            "identified": identified,
+            "start": start,
+            "end": end,
+            "duration": end - identified,
+            "duration_i2s": start - identified,
+            "duration_s2e": end - start
+        }))
+    return reduced
 
-    resource_data = data[stack_name][logical_resource_id]
-    
-    # Update timestamps based on event type and status
+def mark_stack_initiated(resource_data, timestamp):
+    """
+    Stack creation initiation
+    """
+    resource_data["identified"] = timestamp
+    resource_data["start"] = timestamp
+
+def mark_creation_started(resource_data, timestamp):
+    """
+    Resource creation actually starting
+    """
+    if resource_data["identified"] is None:
+        resource_data["identified"] = timestamp
+    resource_data["start"] = timestamp
+
+def mark_identified(resource_data, timestamp):
+    """
+    First time seeing this resource
+    """
+    if resource_data["identified"] is None:
+        resource_data["identified"] = timestamp
+
+def mark_complete(resource_data, timestamp):
+    """
+    Resource creation finished; returns True so the caller knows to emit a trace
+    """
+    resource_data["end"] = timestamp
+
+    # Calculate durations only when we have all necessary timestamps
+    if resource_data["identified"] is not None and resource_data["start"] is not None:
+        resource_data["duration_i2s"] = resource_data["start"] - resource_data["identified"]
+        resource_data["duration_s2e"] = resource_data["end"] - resource_data["start"]
+        resource_data["duration"] = resource_data["end"] - resource_data["identified"]
+    return True
+
+# Pulls the fields update_data_for_event needs out of an event in a single call
+EVENT_FIELDS = itemgetter("StackName", "LogicalResourceId", "ResourceStatus", "Timestamp")
+
+# Starting point for each resource's timing data; timestamps are seconds from the
+# deployment start and durations are whole seconds
+NEW_RESOURCE = {
+    "identified": None,  # When resource is first seen
+    "start": None,      # When creation actually starts
+    "end": None,        # When creation completes
+    "duration": None,   # Total time from identification to completion
+    "duration_i2s": None,  # Time from identification to start
+    "duration_s2e": None   # Time from start to completion
+}
+
+# CloudFormation reports these reasons in a fixed case, so most events skip lower()
+KNOWN_REASONS = {
+    "User Initiated": "user initiated",
+    "Resource creation Initiated": "resource creation initiated",
+}
+
+# Handlers keyed on (status, lowercased reason); a None reason matches any other reason
+EVENT_HANDLERS = {
+    ("CREATE_IN_PROGRESS", "user initiated"): mark_stack_initiated,
+    ("CREATE_IN_PROGRESS", "resource creation initiated"): mark_creation_started,
+    ("CREATE_IN_PROGRESS", None): mark_identified,
+    ("CREATE_COMPLETE", None): mark_complete,
+}
+
+def update_data_for_event(event, data, start_time: int = 0):
+    """
+    Update the data structure with event information for waterfall visualization,
+    returning the resource's entry when the event completes it and None otherwise.
+    Timestamps are stored as seconds after start_time (epoch seconds).
+    """
+    stack_name, logical_resource_id, resource_status, timestamp = EVENT_FIELDS(event)
+    if resource_status not in CREATE_STATUSES:
+        return None
+
+    # Only in-progress events are told apart by their reason
+    resource_status_reason = None
     if resource_status == "CREATE_IN_PROGRESS":
-        if resource_status_reason == "user initiated":
-            # Stack creation initiation
-            resource_data["identified"] = timestamp
-            resource_data["start"] = timestamp
-        elif resource_status_reason == "resource creation initiated":
-            # Resource creation actually starting
-            if resource_data["identified"] is None:
-                resource_data["identified"] = timestamp
-            resource_data["start"] = timestamp
-        else:
-            # First time seeing this resource
-            if resource_data["identified"] is None:
-                resource_data["identified"] = timestamp
-                
-    elif resource_status == "CREATE_COMPLETE":
-        # Resource creation finished
-        resource_data["end"] = timestamp
-        
-        # Calculate durations only when we have all necessary timestamps
-        if resource_data["identified"] and resource_data["start"] and resource_data["end"]:
-            resource_data["duration_i2s"] = resource_data["start"] - resource_data["identified"]
-            resource_data["duration_s2e"] = resource_data["end"] - resource_data["start"]
-            resource_data["duration"] = resource_data["end"] - resource_data["identified"]
+        reason = event.get("ResourceStatusReason") or ""
+        resource_status_reason = KNOWN_REASONS.get(reason) or (reason.lower() if reason else "")
+
+    # Initialize stack and resource data if needed
+    stack_data = data.setdefault(stack_name, {})
+    resource_data = stack_data.get(logical_resource_id)
+    if resource_data is None:
+        resource_data = stack_data[logical_resource_id] = NEW_RESOURCE.copy()
+
+    # Update timestamps based on event type and status. Storing them as whole seconds from
+    # the deployment start makes "identified" the trace's base offset, and durations
+    # plain integer subtraction
+    handler = (EVENT_HANDLERS.get((resource_status, resource_status_reason))
+               or EVENT_HANDLERS.get((resource_status, None)))
+    if handler(resource_data, int(timestamp.timestamp()) - start_time):
+        return resource_data
+    return None
 
 def format_time_for_axis(seconds: float) -> str:
     """
@@ -386,9 +588,17 @@ def format_time_for_axis(seconds: float) -> str:
     minutes, seconds = divmod(int(seconds), 60)
     return f"{minutes:02}:{seconds:02}"
 
-def display_figure(fig, data, events, stackname):
-    # Calculate total duration in seconds from the first trace's base value
-    total_duration = max(trace.base + sum(trace.x) for trace in fig.data)
+def get_trace_end(trace) -> int:
+    """
+    Latest point in seconds covered by a trace
+    """
+    if trace.type == "bar":
+        return max(base + x for base, x in zip(trace.base, trace.x))
+    return trace.base + sum(trace.x)
+
+def display_figure(fig, data, event_count, stackname):
+    # Calculate total duration in seconds from where the last trace ends
+    total_duration = max(get_trace_end(trace) for trace in fig.data)
     
     fig.update_layout(
         title={
@@ -397,7 +607,7 @@ def display_figure(fig, data, events, stackname):
             "font": {"family": "Open Sans, light", "size": 20}
         },
         showlegend=False,
-        height=max(len(events) * 8, 400),
+        height=max(event_count * 8, 400),
         font=DEFAULT_FONT,
         plot_bgcolor="#FFFFFF",
         paper_bgcolor="#FFFFFF",
@@ -424,33 +634,26 @@ def display_figure(fig, data, events, stackname):
             constrain="domain",
             constraintoward="middle",
             tickson="boundaries",
-            range=[-0.2, len(events) - 0.2]
+            range=[-0.2, event_count - 0.2]
             # scaleanchor="x",  # Forces consistent scaling
             # scaleratio=0.3    # Controls aspect ratio of the row
         )
     )
     
     for trace in fig.data:
+        # Bar traces carry a base and colour per bar; a waterfall shares them across its segments
+        is_bar = trace.type == "bar"
+        color = trace.marker.color if is_bar else trace.increasing.marker.color
+        
         # Create meaningful customdata for each bar segment
         customdata = []
         for i in range(len(trace.y[0])):
-            resource_type = "Resource"  # Default value
-            if hasattr(trace, 'increasing') and 'marker' in trace.increasing:
-                color = trace.increasing.marker.color
-                if color == COLORS["stack"]["main"]:
-                    resource_type = "Main Stack"
-                elif color == COLORS["stack"]["nested"]:
-                    resource_type = "Nested Stack"
-                elif color in COLORS["resource"].values():
-                    # Reverse lookup the resource category
-                    resource_type = next(
-                        (k.title() for k, v in COLORS["resource"].items() if v == color),
-                        "Resource"
-                    )
+            base = trace.base[i] if is_bar else trace.base
+            resource_type = get_color_label(color if isinstance(color, str) else color[i])
             
             duration = format_time_from_seconds(trace.x[i]) if trace.x[i] > 0 else "00:00:00"
-            start_time = format_time_from_seconds(trace.base)
-            end_time = format_time_from_seconds(trace.base + trace.x[i])
+            start_time = format_time_from_seconds(base)
+            end_time = format_time_from_seconds(base + trace.x[i])
             
             customdata.append([
                 resource_type,
@@ -482,7 +685,6 @@ def display_figure(fig, data, events, stackname):
     )
     
     fig.update_traces(
-        connector_visible=False,
         textfont={"color": "#2C3E50"},
         width=0.6, # This affects how big the duration numbers appear. 0.4 is too small for > 100 resources.
         alignmentgroup="resource",